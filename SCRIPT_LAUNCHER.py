@@ -1,18 +1,40 @@
 import sys
 import os
 import json
-import subprocess
+import codecs
 import pty
+import time
+import shlex
 import fcntl
-import select
 import signal
 import termios
 import struct
+
+try:
+    import orjson  # C-implemented, noticeably faster than stdlib json
+except ImportError:
+    orjson = None
+
+try:
+    import platformdirs
+except ImportError:
+    platformdirs = None
+
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                             QPushButton, QLabel, QListWidget, QFileDialog, QMessageBox,
                             QFrame, QStatusBar, QSplitter, QTextEdit, QSizePolicy, QLineEdit)
-from PyQt6.QtCore import Qt, QSize, QProcess, QTimer, pyqtSignal, pyqtSlot, QIODevice
-from PyQt6.QtGui import QFont, QColor, QTextCursor, QPalette, QKeyEvent
+from PyQt6.QtCore import (Qt, QSize, QProcess, QTimer, QSocketNotifier, QObject,
+                          QRunnable, QThreadPool, pyqtSignal, pyqtSlot, QIODevice)
+from PyQt6.QtGui import QFont, QColor, QTextCursor, QTextCharFormat, QPalette, QKeyEvent
+
+# UI constants built once at import time instead of per widget instance
+_TERM_FONT = QFont("Courier New", 10)
+_TITLE_FONT = QFont("Helvetica", 16)
+_TERM_BG = QColor(0, 0, 0)  # Black background
+_TERM_FG = QColor(170, 170, 170)  # Light gray text
+_ERR_FORMAT = QTextCharFormat()
+_ERR_FORMAT.setForeground(QColor(255, 100, 100))  # Light red for errors
+
 
 class InteractiveTerminal(QWidget):
     """Interactive terminal widget that captures subprocess output and allows input."""
@@ -30,12 +52,17 @@ class InteractiveTerminal(QWidget):
         # Output area
         self.output = QTextEdit(self)
         self.output.setReadOnly(True)
-        self.output.setFont(QFont("Courier New", 10))
+        self.output.setFont(_TERM_FONT)
+
+        # Bound scrollback so long-running scripts can't grow the document
+        # (and the undo stack) without limit
+        self.output.document().setMaximumBlockCount(5000)
+        self.output.setUndoRedoEnabled(False)
 
         # Set colors for terminal-like appearance
         palette = self.output.palette()
-        palette.setColor(QPalette.ColorRole.Base, QColor(0, 0, 0))  # Black background
-        palette.setColor(QPalette.ColorRole.Text, QColor(170, 170, 170))  # Light gray text
+        palette.setColor(QPalette.ColorRole.Base, _TERM_BG)
+        palette.setColor(QPalette.ColorRole.Text, _TERM_FG)
         self.output.setPalette(palette)
 
         # No Input line in InteractiveTerminal anymore - input is handled by ScriptLauncherApp
@@ -53,35 +80,64 @@ class InteractiveTerminal(QWidget):
         layout.addLayout(button_layout)
 
         # Process management
-        self.process = None
+        self.child_pid = None
         self.master_fd = None
         self.slave_fd = None
+        self.log_fd = None
         self.is_running = False
 
-        # Input/output handling
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.read_pty)
+        # Readiness notifiers on the PTY master fd (created per run_command)
+        self.notifier = None
+        self.hup_notifier = None
+
+        # pidfd-based child-exit notification (Linux)
+        self.pidfd = None
+        self.pidfd_notifier = None
+
+        # Incremental decoder so multi-byte sequences split across reads survive
+        self.decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+        # Coalesce appends into at most one insert/repaint per ~frame
+        self._pending = []
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(16)
+        self._flush_timer.timeout.connect(self._flush)
 
         # Initial state
         # input_field disabled here is also removed, as no input field in this widget anymore
 
     def clear_terminal(self):
         """Clear the terminal output."""
+        self._pending.clear()
         self.output.clear()
 
-    def run_command(self, command, args=None, cwd=None):
-        """Run a command in the terminal."""
+    def run_command(self, command, args=None, cwd=None, log_path=None):
+        """Run a command in the terminal, optionally teeing raw output to a file."""
         self.clear_terminal()
-        command_str = f"{command} {' '.join(args) if args else ''}" if args else command
-        self.append(f"$ {command_str}\n")
+        cmd_args = (command, *args) if args else (command,)
+        self.append(f"$ {shlex.join(cmd_args)}\n")
 
         # Stop any existing process
         self.stop_process()
 
+        # Fresh decoder state: don't let a half-read sequence from the
+        # previous run bleed into this one
+        self.decoder.reset()
+
         try:
-            # Create pseudo-terminal
+            # Create pseudo-terminal. A real PTY (rather than QProcess pipes)
+            # is deliberate: scripts see a tty, so stdout stays line-buffered
+            # and input() prompts appear immediately instead of being held in
+            # a block buffer.
             self.master_fd, self.slave_fd = pty.openpty()
 
+            # Optional tee of the raw output bytes to a log file; the drain
+            # loop writes the bytes it already holds, so the log path adds
+            # one write per drain and never re-reads or re-decodes
+            if log_path:
+                self.log_fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+
             # Make the PTY non-blocking
             fl = fcntl.fcntl(self.master_fd, fcntl.F_GETFL)
             fcntl.fcntl(self.master_fd, fcntl.F_SETFL, fl | os.O_NONBLOCK)
@@ -91,25 +147,55 @@ class InteractiveTerminal(QWidget):
             attrs[3] = attrs[3] & ~termios.ECHO  # Turn off terminal echo
             termios.tcsetattr(self.slave_fd, termios.TCSANOW, attrs)
 
-            # Prepare command
-            cmd_args = [command]
-            if args:
-                cmd_args.extend(args)
-
-            # Start the process
+            # Start the process. posix_spawn does the dup2/setsid work in the
+            # kernel in one syscall, avoiding the slow fork path that
+            # preexec_fn forces on subprocess.Popen.
+            file_actions = [
+                (os.POSIX_SPAWN_DUP2, self.slave_fd, 0),
+                (os.POSIX_SPAWN_DUP2, self.slave_fd, 1),
+                (os.POSIX_SPAWN_DUP2, self.slave_fd, 2),
+                (os.POSIX_SPAWN_CLOSE, self.slave_fd),
+            ]
             self.is_running = True
-            self.process = subprocess.Popen(
-                cmd_args,
-                stdin=self.slave_fd,
-                stdout=self.slave_fd,
-                stderr=self.slave_fd,
-                cwd=cwd,
-                preexec_fn=os.setsid,
-                universal_newlines=True
-            )
-
-            # Start timer to read output
-            self.timer.start(50)  # Check for output every 50ms
+            # posix_spawn has no cwd parameter; the child inherits ours, so
+            # switch around the spawn (the GUI thread is the only caller)
+            prev_cwd = os.getcwd() if cwd else None
+            if cwd:
+                os.chdir(cwd)
+            try:
+                self.child_pid = os.posix_spawn(
+                    command, cmd_args, os.environ,
+                    file_actions=file_actions, setsid=True
+                )
+            finally:
+                if prev_cwd is not None:
+                    os.chdir(prev_cwd)
+
+            # The child owns the slave end now; close our copy so the master
+            # returns EOF/EIO when the child exits. Holding it open would
+            # keep the PTY alive and exit would never be signalled on
+            # platforms without pidfd_open (macOS). send_input writes to the
+            # master, so nothing here needs the slave after spawn.
+            os.close(self.slave_fd)
+            self.slave_fd = None
+
+            # Let the Qt event loop watch the fd instead of polling on a timer
+            self.notifier = QSocketNotifier(self.master_fd, QSocketNotifier.Type.Read, self)
+            self.notifier.activated.connect(self.read_pty)
+            self.hup_notifier = QSocketNotifier(self.master_fd, QSocketNotifier.Type.Exception, self)
+            self.hup_notifier.activated.connect(self.stop_process)
+
+            # On Linux a pidfd becomes readable when the child exits, so exit
+            # detection is event-driven too; elsewhere EOF/EIO on the PTY
+            # master covers it
+            if hasattr(os, 'pidfd_open'):
+                try:
+                    self.pidfd = os.pidfd_open(self.child_pid)
+                except OSError:
+                    self.pidfd = None
+                else:
+                    self.pidfd_notifier = QSocketNotifier(self.pidfd, QSocketNotifier.Type.Read, self)
+                    self.pidfd_notifier.activated.connect(self._child_exited)
 
             # Input is now handled by the ScriptLauncherApp's args_input field, no need to enable input_field here.
 
@@ -141,50 +227,100 @@ class InteractiveTerminal(QWidget):
     def read_pty(self):
         """Read from the PTY master file descriptor."""
         if not self.is_running or self.master_fd is None:
-            self.timer.stop()
             return
 
         try:
-            # Check if the process is still running
-            if self.process and self.process.poll() is not None:
-                self.append(f"\nProcess exited with code {self.process.returncode}\n")
-                self.stop_process()
-                return
-
-            # Check for output
-            rlist, _, _ = select.select([self.master_fd], [], [], 0)
-            if self.master_fd in rlist:
+            # Drain everything available in large chunks, then decode and
+            # append once, so a burst of output costs one insert instead of
+            # one per kilobyte
+            buf = bytearray()
+            eof = False
+            while True:
                 try:
-                    data = os.read(self.master_fd, 1024)
-                    if data:
-                        text = data.decode('utf-8', errors='replace')
-                        self.append_text(text)
-                    else:
-                        # EOF reached
-                        self.stop_process()
+                    chunk = os.read(self.master_fd, 1 << 16)
+                except BlockingIOError:
+                    break
                 except OSError as e:
-                    if e.errno == 5:  # Input/output error - likely child process terminated
-                        self.stop_process()
-                    else:
-                        self.append(f"PTY error: {str(e)}\n")
-                        self.stop_process()
+                    if e.errno == 5:  # Input/output error - child side closed
+                        # Treat like EOF, but keep what was already drained
+                        eof = True
+                        break
+                    raise
+                if not chunk:
+                    eof = True
+                    break
+                buf += chunk
+
+            if buf:
+                if self.log_fd is not None:
+                    os.write(self.log_fd, buf)
+                self.append_text(self.decoder.decode(bytes(buf)))
+            if eof:
+                self.stop_process()
+        except OSError as e:
+            if e.errno == 5:  # Input/output error - likely child process terminated
+                self.stop_process()
+            else:
+                self.append(f"PTY error: {str(e)}\n")
+                self.stop_process()
         except Exception as e:
             self.append(f"Error reading from PTY: {str(e)}\n")
             self.stop_process()
 
+    def _child_exited(self):
+        """Child exit signalled via pidfd: drain remaining output, then clean up."""
+        if self.pidfd_notifier is not None:
+            self.pidfd_notifier.setEnabled(False)
+        self.read_pty()  # Pick up anything the child wrote just before exiting
+        if self.is_running:
+            self.stop_process()
+
     def stop_process(self):
         """Stop the current process and clean up."""
         self.is_running = False
-        self.timer.stop()
 
-        # Kill process if it's still running
-        if self.process:
+        # Tear down fd notifiers before closing the fds they watch
+        for notifier in (self.notifier, self.hup_notifier, self.pidfd_notifier):
+            if notifier is not None:
+                notifier.setEnabled(False)
+                notifier.deleteLater()
+        self.notifier = None
+        self.hup_notifier = None
+        self.pidfd_notifier = None
+
+        if self.pidfd is not None:
+            os.close(self.pidfd)
+            self.pidfd = None
+
+        # Flush any incomplete trailing multi-byte sequence out of the decoder
+        tail = self.decoder.decode(b'', final=True)
+        if tail:
+            self.append_text(tail)
+
+        # Reap the child, terminating its process group first if still alive
+        if self.child_pid is not None:
             try:
-                if self.process.poll() is None:
-                    os.killpg(os.getpgid(self.process.pid), signal.SIGTERM)
-            except (OSError, ProcessLookupError):
-                pass  # Process already terminated
-            self.process = None
+                pid, status = os.waitpid(self.child_pid, os.WNOHANG)
+                if pid == 0:
+                    # setsid made the child a group leader, so killpg on its
+                    # pid takes out the whole group
+                    os.killpg(self.child_pid, signal.SIGTERM)
+                    # Bounded wait only - a child that ignores SIGTERM must
+                    # not freeze the GUI thread; escalate to SIGKILL instead
+                    deadline = time.monotonic() + 0.5
+                    while True:
+                        pid, status = os.waitpid(self.child_pid, os.WNOHANG)
+                        if pid != 0:
+                            break
+                        if time.monotonic() >= deadline:
+                            os.killpg(self.child_pid, signal.SIGKILL)
+                            pid, status = os.waitpid(self.child_pid, 0)
+                            break
+                        time.sleep(0.01)
+                self.append(f"\nProcess exited with code {os.waitstatus_to_exitcode(status)}\n")
+            except (OSError, ChildProcessError, ProcessLookupError):
+                pass  # Process already terminated and reaped
+            self.child_pid = None
 
         # Close file descriptors
         if self.master_fd is not None:
@@ -195,22 +331,60 @@ class InteractiveTerminal(QWidget):
             os.close(self.slave_fd)
             self.slave_fd = None
 
+        if self.log_fd is not None:
+            os.close(self.log_fd)
+            self.log_fd = None
+
+        # Push out anything still queued (including the exit-code line)
+        self._flush()
+
         # Input field is managed in ScriptLauncherApp
         self.processFinished.emit()
 
 
     def append_text(self, text, error=False):
-        """Append text to the terminal with proper formatting."""
-        cursor = self.output.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.End)
+        """Queue text for the terminal, flushed at most once per frame."""
         if error:
-            format = cursor.charFormat()
-            format.setForeground(QColor(255, 100, 100))  # Light red for errors
-            cursor.setCharFormat(format)
+            # Error text carries its own format; flush the queue so ordering
+            # is preserved, then insert directly
+            self._flush()
+            self._insert_text(text, error=True)
+            return
+        self._pending.append(text)
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
 
-        cursor.insertText(text)
-        self.output.setTextCursor(cursor)
-        self.output.ensureCursorVisible()
+    def _flush(self):
+        """Insert all queued text in one shot."""
+        if not self._pending:
+            return
+        text = ''.join(self._pending)
+        self._pending.clear()
+        self._insert_text(text)
+
+    def _insert_text(self, text, error=False):
+        """Append text to the terminal with proper formatting."""
+        # Follow the output only if the view is already pinned to the bottom;
+        # moving the scrollbar is much cheaper than ensureCursorVisible's
+        # cursor-rect layout pass, and it leaves the view alone when the user
+        # has scrolled up to read
+        scrollbar = self.output.verticalScrollBar()
+        follow = scrollbar.value() == scrollbar.maximum()
+
+        # Suspend repaints so a large drain triggers one repaint, not one per line
+        self.output.setUpdatesEnabled(False)
+        try:
+            # moveCursor + insertPlainText skips the textCursor()/setTextCursor
+            # round-trip (and its selection/viewport bookkeeping)
+            self.output.moveCursor(QTextCursor.MoveOperation.End)
+            if error:
+                self.output.textCursor().insertText(text, _ERR_FORMAT)
+            else:
+                self.output.insertPlainText(text)
+        finally:
+            self.output.setUpdatesEnabled(True)
+        if follow:
+            scrollbar.setValue(scrollbar.maximum())
 
     def append(self, text):
         """Append text with a newline."""
@@ -219,6 +393,29 @@ class InteractiveTerminal(QWidget):
     # keyPressEvent is no longer needed as input is handled by ScriptLauncherApp's args_input
 
 
+class _ConfigLoader(QRunnable):
+    """Reads and parses the config off the GUI thread."""
+
+    class Signals(QObject):
+        loaded = pyqtSignal(float, list)
+        failed = pyqtSignal(str)
+
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+        self.signals = self.Signals()
+
+    def run(self):
+        try:
+            mtime = os.stat(self.path).st_mtime
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            scripts = orjson.loads(data) if orjson is not None else json.loads(data)
+            self.signals.loaded.emit(mtime, scripts)
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+
+
 class ScriptLauncherApp(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -226,7 +423,21 @@ class ScriptLauncherApp(QMainWindow):
         self.setMinimumSize(800, 600)
 
         self.scripts = []
-        self.config_file = "/Users/cfrstudio/Dropbox/CFR/SCRIPTS AND TERMINAL/SCRIPT LAUNCHER/script_launcher_config.json"
+        # Per-user config location, resolved and created once so saves don't
+        # pay a makedirs stat each time
+        if platformdirs is not None:
+            cfg_dir = platformdirs.user_config_dir("ScriptLauncher")
+        else:
+            cfg_dir = os.path.join(os.path.expanduser("~"), ".config", "ScriptLauncher")
+        os.makedirs(cfg_dir, exist_ok=True)
+        self.config_file = os.path.join(cfg_dir, "script_launcher_config.json")
+        self._config_mtime = None
+
+        # Coalesce bursts of add/remove into one disk write
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(500)
+        self._save_timer.timeout.connect(self._do_save)
 
         self.setup_ui()
         self.load_scripts()
@@ -239,8 +450,7 @@ class ScriptLauncherApp(QMainWindow):
 
         # Title
         title_label = QLabel("Python Script Launcher")
-        title_font = QFont("Helvetica", 16)
-        title_label.setFont(title_font)
+        title_label.setFont(_TITLE_FONT)
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(title_label)
 
@@ -336,8 +546,11 @@ class ScriptLauncherApp(QMainWindow):
 
         if filepath:
             name = os.path.basename(filepath)
-            self.scripts.append({"name": name, "path": filepath})
-            self.update_scripts_list()
+            script = {"name": name, "path": filepath,
+                      "dir": os.path.dirname(filepath),
+                      "display": f"{name} ({filepath})"}
+            self.scripts.append(script)
+            self.scripts_list.addItem(script["display"])
             self.save_scripts()
             self.statusBar.showMessage(f"Added script: {name}")
 
@@ -346,7 +559,7 @@ class ScriptLauncherApp(QMainWindow):
         if selected_row >= 0:
             script = self.scripts[selected_row]
             del self.scripts[selected_row]
-            self.update_scripts_list()
+            self.scripts_list.takeItem(selected_row)
             self.save_scripts()
             self.statusBar.showMessage(f"Removed script: {script['name']}")
 
@@ -360,8 +573,8 @@ class ScriptLauncherApp(QMainWindow):
         self.statusBar.showMessage(f"Running: {script['name']}...")
 
         try:
-            # Get the directory of the script
-            script_dir = os.path.dirname(script['path'])
+            # Directory of the script, cached on the dict at add/load time
+            script_dir = script['dir']
 
             # No script arguments from args_input at start anymore - it's for interactive input now.
 
@@ -377,28 +590,68 @@ class ScriptLauncherApp(QMainWindow):
         """Handle process completion."""
         self.statusBar.showMessage("Process finished")
 
-    def update_scripts_list(self):
-        self.scripts_list.clear()
-        for script in self.scripts:
-            self.scripts_list.addItem(f"{script['name']} ({script['path']})")
+    def closeEvent(self, event):
+        # Flush any pending debounced save so edits aren't lost on quit
+        if self._save_timer.isActive():
+            self._save_timer.stop()
+            self._do_save()
+        super().closeEvent(event)
+
+    def _rebuild_scripts_list(self):
+        """Rebuild the whole list widget; only needed after a full (re)load."""
+        self.scripts_list.setUpdatesEnabled(False)
+        self.scripts_list.blockSignals(True)
+        try:
+            self.scripts_list.clear()
+            self.scripts_list.addItems([script["display"] for script in self.scripts])
+        finally:
+            self.scripts_list.blockSignals(False)
+            self.scripts_list.setUpdatesEnabled(True)
 
     def save_scripts(self):
+        """Schedule a config write, coalescing rapid edits into one save."""
+        self._save_timer.start()
+
+    def _do_save(self):
         try:
-            # Ensure directory exists
-            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(self.scripts, f)
+            if orjson is not None:
+                data = orjson.dumps(self.scripts, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(self.scripts, indent=2).encode()
+            # Write to a temp file and rename so a crash mid-write can't
+            # leave a truncated config behind
+            tmp_file = self.config_file + '.tmp'
+            with open(tmp_file, 'wb') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.config_file)
+            self._config_mtime = os.stat(self.config_file).st_mtime
         except Exception as e:
             self.statusBar.showMessage(f"Error saving configuration: {str(e)}")
 
     def load_scripts(self):
-        try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    self.scripts = json.load(f)
-                    self.update_scripts_list()
-        except Exception as e:
-            self.statusBar.showMessage(f"Error loading configuration: {str(e)}")
+        """Kick off an async config load so startup paint isn't blocked."""
+        if not os.path.exists(self.config_file):
+            return
+        self._loader = _ConfigLoader(self.config_file)
+        self._loader.signals.loaded.connect(self._scripts_loaded)
+        self._loader.signals.failed.connect(
+            lambda msg: self.statusBar.showMessage(f"Error loading configuration: {msg}"))
+        QThreadPool.globalInstance().start(self._loader)
+
+    def _scripts_loaded(self, mtime, scripts):
+        """Receive the parsed config on the GUI thread (queued connection)."""
+        # Skip the rebuild entirely if the file hasn't changed
+        if mtime == self._config_mtime:
+            return
+        # Configs saved by older versions lack the cached fields
+        for script in scripts:
+            script.setdefault("dir", os.path.dirname(script['path']))
+            script.setdefault("display", f"{script['name']} ({script['path']})")
+        self.scripts = scripts
+        self._config_mtime = mtime
+        self._rebuild_scripts_list()
 
 
 if __name__ == '__main__':